@@ -1,19 +1,61 @@
 import os
 import json
+import atexit
+import time
+import functools
+import logging
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for further channel changes before writing them out
+SAVE_DELAY = 0.5
+# Seconds to wait before trying again after a failed write
+SAVE_RETRY_DELAY = 5
+# Most chat titles kept from get_chat lookups; the least recently added are evicted first
+CHAT_TITLE_CACHE_SIZE = 1024
+
 class ConfigManager:
     def __init__(self):
-        load_dotenv()
+        # Deployments that inject the whole environment directly don't need .env looked up and parsed.
+        # load_dotenv never overrides variables that are already set.
+        if os.getenv('BOT_TOKEN') is None or os.getenv('ADMIN_IDS') is None:
+            load_dotenv()
         self.bot_token = os.getenv('BOT_TOKEN')
-        self.admin_ids = self._load_admin_ids()
+        self.admin_ids = frozenset(
+            int(uid) for uid in (os.getenv('ADMIN_IDS') or '').split(',') if uid.strip()
+        )
+        # Public HTTPS base URL; when set, updates are pushed to a webhook instead of polled
+        self.webhook_url = os.getenv('WEBHOOK_URL')
+        self.port = int(os.getenv('PORT') or 8443)
         self.fixed_channels_file = 'config/fixed_channels.json'
-
-    def _load_admin_ids(self):
-        admin_ids_str = os.getenv('ADMIN_IDS')
-        if admin_ids_str:
-            return [int(uid.strip()) for uid in admin_ids_str.split(',')]
-        return []
+        # Parsed fixed_channels.json, kept in memory as the source of truth
+        self._channels_cache = None
+        self._channels_by_id = {}
+        # Guards the in-memory channels; only held briefly, never across disk I/O
+        self._lock = threading.Lock()
+        # Serialises writes to fixed_channels.json, so an older snapshot never overwrites a newer one
+        self._write_lock = threading.Lock()
+        # Set when the in-memory channels differ from the file; see _mark_dirty
+        self._dirty = False
+        self._dirty_event = threading.Event()
+        self._flusher = None
+        # The flusher is a daemon thread, so whatever it hasn't written yet is saved on exit
+        atexit.register(self.flush)
+        # Chat titles already fetched from Telegram, keyed by chat id
+        self._chat_titles = OrderedDict()
 
     def get_bot_token(self):
         return self.bot_token
@@ -21,22 +63,122 @@ class ConfigManager:
     def get_admin_ids(self):
         return self.admin_ids
 
+    def get_webhook_url(self):
+        return self.webhook_url
+
+    def get_port(self):
+        return self.port
+
     def get_fixed_channels(self):
-        if os.path.exists(self.fixed_channels_file):
-            with open(self.fixed_channels_file, 'r') as f:
-                return json.load(f)
-        return []
+        if self._channels_cache is None:
+            self._set_channels_cache(self._read_channels())
+        return self._channels_cache
+
+    def reload(self):
+        # This process is the only writer, so the file is only re-read on startup or on request.
+        # Changes not written yet would be lost by re-reading, so they are written first.
+        self.flush()
+        channels = self._read_channels()
+        with self._lock:
+            self._set_channels_cache(channels)
+
+    def _read_channels(self):
+        try:
+            with open(self.fixed_channels_file, 'rb') as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return []
+
+    def get_channel(self, channel_id):
+        self.get_fixed_channels()
+        return self._channels_by_id.get(channel_id)
+
+    def get_cached_chat_title(self, chat_id):
+        title = self._chat_titles.get(chat_id)
+        if title is None:
+            channel = self.get_channel(chat_id)
+            title = channel['name'] if channel else None
+        return title
+
+    def cache_chat_title(self, chat_id, title):
+        self._chat_titles[chat_id] = title
+        if len(self._chat_titles) > CHAT_TITLE_CACHE_SIZE:
+            self._chat_titles.popitem(last=False)
 
     def add_fixed_channel(self, channel_id, channel_name):
-        channels = self.get_fixed_channels()
-        channels.append({'id': channel_id, 'name': channel_name})
-        with open(self.fixed_channels_file, 'w') as f:
-            json.dump(channels, f, indent=4)
+        with self._lock:
+            channel = self.get_channel(channel_id)
+            if channel is not None and channel['name'] == channel_name:
+                # Already stored as-is, nothing to write
+                return
+            channels_by_id = dict(self._channels_by_id)
+            channels_by_id[channel_id] = {'id': channel_id, 'name': channel_name}
+            self._update_channels(channels_by_id)
+        self._mark_dirty()
 
     def remove_fixed_channel(self, channel_id):
-        channels = self.get_fixed_channels()
-        channels = [c for c in channels if c['id'] != channel_id]
-        with open(self.fixed_channels_file, 'w') as f:
-            json.dump(channels, f, indent=4)
+        with self._lock:
+            if self.get_channel(channel_id) is None:
+                return
+            channels_by_id = dict(self._channels_by_id)
+            del channels_by_id[channel_id]
+            self._update_channels(channels_by_id)
+        self._mark_dirty()
+
+    def flush(self):
+        # Write pending channel changes to disk, if any
+        with self._write_lock:
+            # Snapshot under _lock and write outside it, so mutators never wait on the disk
+            with self._lock:
+                if not self._dirty:
+                    return
+                channels = self._channels_cache
+                self._dirty = False
+            try:
+                tmp = self.fixed_channels_file + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(_dumps(channels))
+                    # Make sure the data is on disk before the rename makes it visible
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.fixed_channels_file)
+            except BaseException:
+                # Still not on disk; keep it pending for the next flush
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def _set_channels_cache(self, channels):
+        self._channels_cache = channels
+        self._channels_by_id = {c['id']: c for c in channels}
+
+    def _update_channels(self, channels_by_id):
+        self._channels_cache = list(channels_by_id.values())
+        self._channels_by_id = channels_by_id
+        self._dirty = True
+
+    def _mark_dirty(self):
+        # Writes happen on a background thread, so callers never wait on the disk
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='config-flusher', daemon=True)
+            self._flusher.start()
+        self._dirty_event.set()
+
+    def _flush_loop(self):
+        while True:
+            self._dirty_event.wait()
+            # Let a burst of changes settle so it costs a single write
+            time.sleep(SAVE_DELAY)
+            self._dirty_event.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the thread alive and the changes pending; try again a bit later
+                logger.exception("Failed to save %s", self.fixed_channels_file)
+                time.sleep(SAVE_RETRY_DELAY)
+                self._dirty_event.set()
 
 
+@functools.lru_cache(maxsize=1)
+def get_config():
+    return ConfigManager()
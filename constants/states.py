@@ -0,0 +1,6 @@
+# Conversation states for the admin input flows registered in main.py
+(
+    AWAIT_DELAY, AWAIT_RETRY, AWAIT_FOOTER, AWAIT_CHANNEL_ID,
+    AWAIT_SCHEDULED_MESSAGE, AWAIT_SCHEDULED_TIME, AWAIT_BATCH_MESSAGE,
+    AWAIT_MAX_BATCH
+) = range(8)
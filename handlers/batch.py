@@ -1,32 +1,60 @@
+from collections import deque
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils.keyboard import main_menu_keyboard
 from constants.emoji import Emoji
+from constants.states import AWAIT_BATCH_MESSAGE
+
+DEFAULT_MAX_BATCH = 500
+
+BATCH_MENU_TEXT = f"{Emoji.BATCH} Batch Menu:\n- Collect messages\n- Clear batch\n- Show batch content"
+
+def reset_batch(context: ContextTypes.DEFAULT_TYPE):
+    # Bounded so a single user can't grow the batch without limit; collect_message refuses messages once full
+    context.user_data["batch_messages"] = deque(maxlen=context.bot_data.get("max_batch", DEFAULT_MAX_BATCH))
+    # The batch joined with newlines, kept up to date on every append so previews don't re-join it
+    context.user_data["batch_text"] = ""
+
+def drop_posted(context: ContextTypes.DEFAULT_TYPE, batch, count):
+    # Removes the first `count` messages, the ones just posted, keeping any collected while posting
+    if context.user_data.get("batch_messages") is not batch:
+        # The batch was cleared or replaced in the meantime
+        return
+    for _ in range(count):
+        batch.popleft()
+    context.user_data["batch_text"] = "\n".join(batch)
 
 async def batch_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(f"{Emoji.BATCH} Batch Menu:\n- Collect messages\n- Clear batch\n- Show batch content", reply_markup=main_menu_keyboard())
+    await update.effective_message.reply_text(BATCH_MENU_TEXT, reply_markup=main_menu_keyboard())
+    return AWAIT_BATCH_MESSAGE
 
 async def collect_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Logic to collect messages into a batch
     if "batch_messages" not in context.user_data:
-        context.user_data["batch_messages"] = []
-    context.user_data["batch_messages"].append(update.message.text)
-    await update.message.reply_text(f"{Emoji.SUCCESS} Message added to batch. Current batch size: {len(context.user_data["batch_messages"])}")
+        reset_batch(context)
+    batch = context.user_data["batch_messages"]
+    text = update.message.text
+    if len(batch) == batch.maxlen:
+        await update.effective_message.reply_text(f"{Emoji.WARNING} Batch is full ({batch.maxlen} messages). Post or clear it before adding more; this message was not added.")
+        return
+    batch.append(text)
+    prev = context.user_data["batch_text"]
+    context.user_data["batch_text"] = f"{prev}\n{text}" if prev else text
+    await update.effective_message.reply_text(f"{Emoji.SUCCESS} Message added to batch. Current batch size: {len(context.user_data['batch_messages'])}")
 
 async def clear_batch(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Logic to clear the batch
     if "batch_messages" in context.user_data:
-        context.user_data["batch_messages"] = []
-        await update.message.reply_text(f"{Emoji.SUCCESS} Batch cleared.")
+        reset_batch(context)
+        await update.effective_message.reply_text(f"{Emoji.SUCCESS} Batch cleared.")
     else:
-        await update.message.reply_text(f"{Emoji.INFO} Batch is already empty.")
+        await update.effective_message.reply_text(f"{Emoji.INFO} Batch is already empty.")
 
 async def show_batch(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Logic to show batch content
     if "batch_messages" in context.user_data and context.user_data["batch_messages"]:
-        messages = "\n".join(context.user_data["batch_messages"])
-        await update.message.reply_text(f"{Emoji.BATCH} Current batch messages:\n\n{messages}")
+        await update.effective_message.reply_text(f"{Emoji.BATCH} Current batch messages:\n\n{context.user_data['batch_text']}")
     else:
-        await update.message.reply_text(f"{Emoji.INFO} Batch is empty.")
+        await update.effective_message.reply_text(f"{Emoji.INFO} Batch is empty.")
 
 
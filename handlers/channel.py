@@ -1,73 +1,83 @@
-import os
+import asyncio
 from telegram import Update
-from telegram.ext import ContextTypes
-from config.manager import ConfigManager
+from telegram.ext import ContextTypes, ConversationHandler
+from config.manager import get_config
 from utils.keyboard import channel_list_keyboard, channel_manage_keyboard, main_menu_keyboard
 from utils.validators import is_valid_channel_id
+from utils.messages import edit_if_changed
 from constants.emoji import Emoji
+from constants.states import AWAIT_CHANNEL_ID
 
-config = ConfigManager()
+config = get_config()
+
+# How long to wait for get_chat when only a channel ID was sent
+GET_CHAT_TIMEOUT = 2.0
 
 async def channel_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     channels = config.get_fixed_channels()
     if not channels:
-        await update.message.reply_text(f"{Emoji.INFO} No channels added yet. Use 'Add Channel' to add one.", reply_markup=channel_list_keyboard(channels))
+        await update.effective_message.reply_text(f"{Emoji.INFO} No channels added yet. Use 'Add Channel' to add one.", reply_markup=channel_list_keyboard(channels))
     else:
-        await update.message.reply_text(f"{Emoji.CHANNEL} Your channels:", reply_markup=channel_list_keyboard(channels))
+        await update.effective_message.reply_text(f"{Emoji.CHANNEL} Your channels:", reply_markup=channel_list_keyboard(channels))
 
 async def add_channel_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.callback_query.answer()
     await update.callback_query.edit_message_text("Please forward a message from the channel or send the channel ID.")
-    context.user_data["awaiting_channel_id"] = True
+    return AWAIT_CHANNEL_ID
 
 async def handle_channel_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not context.user_data.get("awaiting_channel_id"):
-        return
-
     channel_id = None
     channel_name = ""
 
-    if update.channel_post:
-        channel_id = update.channel_post.chat.id
-        channel_name = update.channel_post.chat.title
-    elif update.message and update.message.text:
+    if update.message.forward_from_chat:
+        # The forwarded message already carries the title, no get_chat round-trip needed
+        channel_id = update.message.forward_from_chat.id
+        channel_name = update.message.forward_from_chat.title
+        config.cache_chat_title(channel_id, channel_name)
+    elif update.message.text:
         try:
             channel_id = int(update.message.text)
-            # Attempt to get channel name if possible, otherwise leave empty
-            try:
-                chat = await context.bot.get_chat(channel_id)
-                channel_name = chat.title
-            except Exception:
-                channel_name = f"Unknown Channel ({channel_id})"
         except ValueError:
-            await update.message.reply_text(f"{Emoji.ERROR} Invalid channel ID. Please send a valid integer ID or forward a message from the channel.")
+            await update.effective_message.reply_text(f"{Emoji.ERROR} Invalid channel ID. Please send a valid integer ID or forward a message from the channel.")
             return
+        if is_valid_channel_id(channel_id):
+            channel_name = await get_channel_name(context, channel_id)
 
     if channel_id and is_valid_channel_id(channel_id):
         config.add_fixed_channel(channel_id, channel_name)
-        await update.message.reply_text(f"{Emoji.SUCCESS} Channel \'{channel_name}\' ({channel_id}) added successfully!", reply_markup=main_menu_keyboard())
-        context.user_data["awaiting_channel_id"] = False
+        await update.effective_message.reply_text(f"{Emoji.SUCCESS} Channel \'{channel_name}\' ({channel_id}) added successfully!", reply_markup=main_menu_keyboard())
+        return ConversationHandler.END
     else:
-        await update.message.reply_text(f"{Emoji.ERROR} Invalid channel. Please ensure it's a supergroup or channel and the bot is an administrator.")
+        await update.effective_message.reply_text(f"{Emoji.ERROR} Invalid channel. Please ensure it's a supergroup or channel and the bot is an administrator.")
+
+async def get_channel_name(context: ContextTypes.DEFAULT_TYPE, channel_id):
+    channel_name = config.get_cached_chat_title(channel_id)
+    if channel_name is None:
+        # Attempt to get channel name if possible, otherwise fall back to a placeholder
+        try:
+            chat = await asyncio.wait_for(context.bot.get_chat(channel_id), GET_CHAT_TIMEOUT)
+            channel_name = chat.title
+            config.cache_chat_title(channel_id, channel_name)
+        except Exception:
+            channel_name = f"Unknown Channel ({channel_id})"
+    return channel_name
 
 async def manage_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    channel_id = int(query.data.split("_")[1])
-    channels = config.get_fixed_channels()
-    channel_info = next((c for c in channels if c["id"] == channel_id), None)
+    channel_id = int(query.data.rsplit("_", 1)[1])
+    channel_info = config.get_channel(channel_id)
     if channel_info:
-        await query.edit_message_text(f"Managing channel: {channel_info["name"]} ({channel_info["id"]})", reply_markup=channel_manage_keyboard(channel_id))
+        await edit_if_changed(query, f"Managing channel: {channel_info['name']} ({channel_info['id']})", reply_markup=channel_manage_keyboard(channel_id))
     else:
         await query.edit_message_text(f"{Emoji.ERROR} Channel not found.", reply_markup=main_menu_keyboard())
 
 async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    channel_id = int(query.data.split("_")[1])
+    channel_id = int(query.data.rsplit("_", 1)[1])
     config.remove_fixed_channel(channel_id)
-    await query.edit_message_text(f"{Emoji.SUCCESS} Channel ({channel_id}) removed.", reply_markup=main_menu_keyboard())
-    await channel_menu(update, context)
+    await query.edit_message_text(f"{Emoji.SUCCESS} Channel ({channel_id}) removed.", reply_markup=channel_list_keyboard(config.get_fixed_channels()))
 
 async def back_to_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -1,14 +1,72 @@
 from telegram import Update
-from telegram.ext import ContextTypes
+from telegram.ext import ContextTypes, ConversationHandler
 from utils.keyboard import main_menu_keyboard
+from handlers.admin import admin_menu
+from handlers.channel import channel_menu, back_to_channels, manage_channel, remove_channel
+from handlers.schedule import schedule_menu, view_scheduled_posts
+from handlers.post import post_menu, execute_post
+from handlers.settings import settings_menu, toggle_merge
+
+WELCOME_TEXT = "Welcome to the Telegram Bot! Use the menu below to navigate."
+HELP_TEXT = "This bot helps you manage channels, schedule posts, and more. Use the menu buttons to explore features."
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text("Welcome to the Telegram Bot! Use the menu below to navigate.", reply_markup=main_menu_keyboard())
+    await update.message.reply_text(WELCOME_TEXT, reply_markup=main_menu_keyboard())
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text("This bot helps you manage channels, schedule posts, and more. Use the menu buttons to explore features.", reply_markup=main_menu_keyboard())
+    await update.message.reply_text(HELP_TEXT, reply_markup=main_menu_keyboard())
 
 async def back_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Returning to main menu.", reply_markup=main_menu_keyboard())
 
+async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("Operation cancelled.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
+
+async def end_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Leaving a pending input flow via the main menu; the menu handler itself replies
+    return ConversationHandler.END
+
+# Main menu button label -> handler. Batch is the entry point of the input conversation instead.
+MENU_DISPATCH = {
+    "Admin": admin_menu,
+    "Channels": channel_menu,
+    "Schedule": schedule_menu,
+    "Post": post_menu,
+    "Settings": settings_menu,
+    "Back to Main Menu": back_to_main_menu,
+}
+
+async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    handler = MENU_DISPATCH.get(update.message.text)
+    if handler:
+        await handler(update, context)
+
+# Inline button callback_data -> handler, for buttons outside the input conversation
+CALLBACK_DISPATCH = {
+    "back_to_channels": back_to_channels,
+    "view_scheduled": view_scheduled_posts,
+    "confirm_post": execute_post,
+    "cancel_post": execute_post,
+    "toggle_merge": toggle_merge,
+}
+
+# callback_data prefix -> handler, for buttons that carry an id; tried in order after CALLBACK_DISPATCH
+CALLBACK_PREFIXES = (
+    ("channel_", manage_channel),
+    ("remove_channel_", remove_channel),
+)
+
+def find_callback_handler(data):
+    handler = CALLBACK_DISPATCH.get(data)
+    if handler is None:
+        for prefix, prefix_handler in CALLBACK_PREFIXES:
+            if data.startswith(prefix):
+                return prefix_handler
+    return handler
 
+async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Buttons that open an input flow are entry points of the conversation and have no route here
+    handler = find_callback_handler(update.callback_query.data)
+    if handler:
+        await handler(update, context)
@@ -1,21 +1,98 @@
+import asyncio
+import logging
+import random
 from telegram import Update
+from telegram.error import BadRequest, NetworkError, RetryAfter
 from telegram.ext import ContextTypes
 from utils.keyboard import confirm_post_keyboard, main_menu_keyboard
-from config.manager import ConfigManager
+from config.manager import get_config
+from utils.formatting import pack_messages, MAX_MESSAGE_LENGTH
+from utils.ratelimit import chat_limiter
+from handlers.batch import drop_posted
 from constants.emoji import Emoji
 
-config = ConfigManager()
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+POST_MENU_TEXT = f"{Emoji.POST} Post Menu:\n- Preview batch\n- Post batch to channels"
+
+# Upper bound on channels posted to concurrently, to stay clear of Telegram's global flood limit
+MAX_CONCURRENT_CHANNELS = 8
+# Used until changed from the Settings menu
+DEFAULT_POST_DELAY = 0
+DEFAULT_RETRY_ATTEMPTS = 3
+# Backoff after a timeout or connection error: doubles per attempt from the base, up to the cap
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 10
 
 async def post_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(f"{Emoji.POST} Post Menu:\n- Preview batch\n- Post batch to channels", reply_markup=main_menu_keyboard())
+    await update.effective_message.reply_text(POST_MENU_TEXT, reply_markup=main_menu_keyboard())
 
 async def preview_post(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if "batch_messages" not in context.user_data or not context.user_data["batch_messages"]:
-        await update.message.reply_text(f"{Emoji.INFO} No messages in batch to preview. Add messages using the Batch menu.")
+        await update.effective_message.reply_text(f"{Emoji.INFO} No messages in batch to preview. Add messages using the Batch menu.")
         return
 
-    messages = "\n".join(context.user_data["batch_messages"])
-    await update.message.reply_text(f"{Emoji.POST} Preview of your post:\n\n{messages}\n\nDo you want to post this?", reply_markup=confirm_post_keyboard())
+    await update.effective_message.reply_text(f"{Emoji.POST} Preview of your post:\n\n{context.user_data['batch_text']}\n\nDo you want to post this?", reply_markup=confirm_post_keyboard())
+
+async def send_with_retry(bot, chat_id, text, retries):
+    limiter = chat_limiter(chat_id)
+    for attempt in range(retries + 1):
+        # Stay under the per-chat limit up front rather than waiting out a RetryAfter
+        await limiter.wait()
+        try:
+            return await bot.send_message(chat_id=chat_id, text=text)
+        except RetryAfter as e:
+            if attempt == retries:
+                raise
+            # Flood control: wait as long as Telegram asks instead of retrying straight away
+            logger.warning("Flood control on %s, retrying in %s s", chat_id, e.retry_after)
+            await asyncio.sleep(e.retry_after)
+        except BadRequest:
+            # Sending the same request again won't fix it
+            raise
+        except NetworkError as e:
+            # Timeouts and connection errors are worth another try, once the connection had time to recover
+            if attempt == retries:
+                raise
+            logger.warning("Sending to %s failed, attempt %d of %d: %s", chat_id, attempt + 1, retries + 1, e)
+            # Jitter keeps channels that failed together from retrying in lockstep
+            await asyncio.sleep(min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) + random.uniform(0, RETRY_BASE_DELAY))
+
+async def post_batch(context: ContextTypes.DEFAULT_TYPE, query, batch, posted_count, messages, channels):
+    delay = context.bot_data.get("post_delay", DEFAULT_POST_DELAY)
+    retries = context.bot_data.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHANNELS)
+
+    async def post_to_channel(channel):
+        async with semaphore:
+            # Messages are sent in order within a channel, paced by the configured delay
+            for i, message in enumerate(messages):
+                if i and delay > 0:
+                    await asyncio.sleep(delay)
+                await send_with_retry(context.bot, channel["id"], message, retries)
+
+    try:
+        results = await asyncio.gather(*(post_to_channel(channel) for channel in channels), return_exceptions=True)
+
+        failures = [
+            f"{Emoji.ERROR} Failed to send to {channel['name']} ({channel['id']}): {result}"
+            for channel, result in zip(channels, results) if isinstance(result, Exception)
+        ]
+        success_count = len(channels) - len(failures)
+        # Listed together rather than one reply per channel, split to stay within the message limit
+        for report in pack_messages(failures):
+            await query.message.reply_text(report)
+
+        if success_count > 0:
+            # Clear the posted messages from the batch, but not ones collected since
+            drop_posted(context, batch, posted_count)
+            await query.edit_message_text(f"{Emoji.SUCCESS} Successfully posted to {success_count} channel(s).")
+        else:
+            await query.edit_message_text(f"{Emoji.ERROR} No posts were successful.")
+    finally:
+        context.user_data["posting"] = False
 
 async def execute_post(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -25,32 +102,41 @@ async def execute_post(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if "batch_messages" not in context.user_data or not context.user_data["batch_messages"]:
             await query.edit_message_text(f"{Emoji.ERROR} No messages in batch to post.")
             return
+        if context.user_data.get("posting"):
+            # A repeated tap on Confirm Post while the first one is still being sent
+            await query.message.reply_text(f"{Emoji.INFO} A post is already in progress.")
+            return
 
-        messages = context.user_data["batch_messages"]
+        # Snapshot, so messages collected while posting don't disturb the fan-out
+        batch = context.user_data["batch_messages"]
+        posted_count = len(batch)
+        messages = list(batch)
+        footer = context.bot_data.get("post_footer")
+        suffix = f"\n\n{footer}" if footer else ""
+        # Every message, merged or not, has to leave room for the footer
+        limit = MAX_MESSAGE_LENGTH - len(suffix)
+        if context.bot_data.get("merge_batch", True):
+            # One request per chunk instead of one per batch item
+            messages = pack_messages(messages, limit=limit)
+        else:
+            # Items stay separate, but ones too long to carry the footer are split
+            messages = [chunk for message in messages for chunk in pack_messages((message,), limit=limit)]
+        if suffix:
+            # Added once per message here, not once per channel in the fan-out
+            messages = [message + suffix for message in messages]
         channels = config.get_fixed_channels()
 
         if not channels:
             await query.edit_message_text(f"{Emoji.WARNING} No channels configured. Please add channels first.")
             return
 
-        success_count = 0
-        for channel in channels:
-            try:
-                for message in messages:
-                    await context.bot.send_message(chat_id=channel["id"], text=message)
-                success_count += 1
-            except Exception as e:
-                await query.message.reply_text(f"{Emoji.ERROR} Failed to send to {channel["name"]} ({channel["id"]}): {e}")
-
-        if success_count > 0:
-            await query.edit_message_text(f"{Emoji.SUCCESS} Successfully posted to {success_count} channel(s).")
-            context.user_data["batch_messages"] = [] # Clear batch after successful post
-        else:
-            await query.edit_message_text(f"{Emoji.ERROR} No posts were successful.")
+        await query.edit_message_text(f"{Emoji.POST} Posting to {len(channels)} channel(s)...")
+        context.user_data["posting"] = True
+        # Pacing and rate limits can keep this going for minutes; run it as a task so the bot
+        # keeps handling other updates meanwhile
+        context.application.create_task(post_batch(context, query, batch, posted_count, messages, channels), update=update)
 
     elif query.data == "cancel_post":
         await query.edit_message_text(f"{Emoji.INFO} Post cancelled.")
 
-    await query.message.reply_text("Returning to main menu.", reply_markup=main_menu_keyboard())
-
 
@@ -1,73 +1,97 @@
 from telegram import Update
-from telegram.ext import ContextTypes
+from telegram.ext import ContextTypes, ConversationHandler
 from utils.keyboard import settings_keyboard, main_menu_keyboard
+from utils.formatting import MAX_MESSAGE_LENGTH
+from utils.validators import parse_non_negative_int
 from constants.emoji import Emoji
+from constants.states import AWAIT_DELAY, AWAIT_RETRY, AWAIT_FOOTER, AWAIT_MAX_BATCH
+
+SETTINGS_MENU_TEXT = f"{Emoji.SETTINGS} Settings Menu:"
+
+# The footer is appended to every post, so it has to leave room for the post itself
+MAX_FOOTER_LENGTH = MAX_MESSAGE_LENGTH // 4
+# Largest batch size an admin can set; it is shared by every user's batch
+MAX_BATCH_LIMIT = 10_000
+# Longest pause between messages; it is spent once per message in every channel
+MAX_POST_DELAY = 60
+# Most retries per message; with the backoff cap each one can add up to ten seconds
+MAX_RETRY_ATTEMPTS = 10
 
 # In a real application, these would be stored persistently (e.g., in a database)
 # For this example, we'll use a simple dictionary in context.bot_data
 
 async def settings_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(f"{Emoji.SETTINGS} Settings Menu:", reply_markup=settings_keyboard())
+    await update.message.reply_text(SETTINGS_MENU_TEXT, reply_markup=settings_keyboard())
 
 async def set_delay_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    await query.edit_message_text("Please send the desired delay in seconds for posting (e.g., 5).")
-    context.user_data["awaiting_delay_input"] = True
+    await query.edit_message_text(f"Please send the desired delay in seconds for posting, from 0 to {MAX_POST_DELAY} (e.g., 5).")
+    return AWAIT_DELAY
 
 async def receive_delay_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not context.user_data.get("awaiting_delay_input"):
+    delay = parse_non_negative_int(update.message.text)
+    if delay is None or delay > MAX_POST_DELAY:
+        await update.message.reply_text(f"{Emoji.ERROR} Invalid input. Please enter an integer from 0 to {MAX_POST_DELAY} for delay, or /cancel.")
         return
-
-    try:
-        delay = int(update.message.text)
-        if delay < 0:
-            raise ValueError
-        context.bot_data["post_delay"] = delay
-        await update.message.reply_text(f"{Emoji.SUCCESS} Post delay set to {delay} seconds.", reply_markup=main_menu_keyboard())
-    except ValueError:
-        await update.message.reply_text(f"{Emoji.ERROR} Invalid input. Please enter a non-negative integer for delay.")
-    finally:
-        context.user_data["awaiting_delay_input"] = False
+    context.bot_data["post_delay"] = delay
+    await update.message.reply_text(f"{Emoji.SUCCESS} Post delay set to {delay} seconds.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
 
 async def set_retry_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    await query.edit_message_text("Please send the desired number of retry attempts (e.g., 3).")
-    context.user_data["awaiting_retry_input"] = True
+    await query.edit_message_text(f"Please send the desired number of retry attempts, from 0 to {MAX_RETRY_ATTEMPTS} (e.g., 3).")
+    return AWAIT_RETRY
 
 async def receive_retry_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not context.user_data.get("awaiting_retry_input"):
+    retries = parse_non_negative_int(update.message.text)
+    if retries is None or retries > MAX_RETRY_ATTEMPTS:
+        await update.message.reply_text(f"{Emoji.ERROR} Invalid input. Please enter an integer from 0 to {MAX_RETRY_ATTEMPTS} for retry attempts, or /cancel.")
         return
-
-    try:
-        retries = int(update.message.text)
-        if retries < 0:
-            raise ValueError
-        context.bot_data["retry_attempts"] = retries
-        await update.message.reply_text(f"{Emoji.SUCCESS} Retry attempts set to {retries}.", reply_markup=main_menu_keyboard())
-    except ValueError:
-        await update.message.reply_text(f"{Emoji.ERROR} Invalid input. Please enter a non-negative integer for retry attempts.")
-    finally:
-        context.user_data["awaiting_retry_input"] = False
+    context.bot_data["retry_attempts"] = retries
+    await update.message.reply_text(f"{Emoji.SUCCESS} Retry attempts set to {retries}.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
 
 async def set_footer_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     await query.edit_message_text("Please send the text for the post footer. Send /clear_footer to remove it.")
-    context.user_data["awaiting_footer_input"] = True
+    return AWAIT_FOOTER
+
+async def clear_footer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.bot_data["post_footer"] = ""
+    await update.message.reply_text(f"{Emoji.SUCCESS} Post footer cleared.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
 
 async def receive_footer_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not context.user_data.get("awaiting_footer_input"):
+    footer_text = update.message.text
+    if len(footer_text) > MAX_FOOTER_LENGTH:
+        await update.message.reply_text(f"{Emoji.ERROR} Footer is too long. Please keep it to {MAX_FOOTER_LENGTH} characters or fewer, or /cancel.")
         return
+    context.bot_data["post_footer"] = footer_text
+    await update.message.reply_text(f"{Emoji.SUCCESS} Post footer set.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
 
-    footer_text = update.message.text
-    if footer_text == "/clear_footer":
-        context.bot_data["post_footer"] = ""
-        await update.message.reply_text(f"{Emoji.SUCCESS} Post footer cleared.", reply_markup=main_menu_keyboard())
-    else:
-        context.bot_data["post_footer"] = footer_text
-        await update.message.reply_text(f"{Emoji.SUCCESS} Post footer set.", reply_markup=main_menu_keyboard())
-    context.user_data["awaiting_footer_input"] = False
+async def set_max_batch_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text("Please send the maximum number of messages a batch can hold (e.g., 500).")
+    return AWAIT_MAX_BATCH
 
+async def receive_max_batch_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    max_batch = parse_non_negative_int(update.message.text)
+    if not max_batch or max_batch > MAX_BATCH_LIMIT:
+        await update.message.reply_text(f"{Emoji.ERROR} Invalid input. Please enter an integer from 1 to {MAX_BATCH_LIMIT} for the batch size, or /cancel.")
+        return
+    context.bot_data["max_batch"] = max_batch
+    await update.message.reply_text(f"{Emoji.SUCCESS} Maximum batch size set to {max_batch}. It applies from the next new or cleared batch.", reply_markup=main_menu_keyboard())
+    return ConversationHandler.END
 
+async def toggle_merge(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    merge_batch = not context.bot_data.get("merge_batch", True)
+    context.bot_data["merge_batch"] = merge_batch
+    state = "enabled" if merge_batch else "disabled"
+    await query.edit_message_text(f"{Emoji.SUCCESS} Merging batch messages into a single post is now {state}.")
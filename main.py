@@ -1,26 +1,35 @@
+import asyncio
 import logging
+import signal
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, MessageHandler,
-    filters, CallbackQueryHandler
+    filters, CallbackQueryHandler, ConversationHandler
 )
 from telegram import Update
-from config.manager import ConfigManager
-from handlers.admin import admin_menu, add_admin, remove_admin, bot_stats
-from handlers.channel import (
-    channel_menu, add_channel_prompt, handle_channel_input,
-    manage_channel, remove_channel, back_to_channels
-)
+from config.manager import get_config
+from utils.filters import AdminTextFilter
+from handlers.admin import add_admin, remove_admin, bot_stats
+from handlers.channel import add_channel_prompt, handle_channel_input
 from handlers.batch import batch_menu, collect_message, clear_batch, show_batch
 from handlers.schedule import (
-    schedule_menu, view_scheduled_posts, schedule_new_post_prompt,
+    schedule_new_post_prompt,
     receive_scheduled_message, receive_scheduled_time
 )
-from handlers.post import post_menu, preview_post, execute_post
-from handlers.menu import start, help_command, back_to_main_menu
+from handlers.post import preview_post
+from handlers.menu import (
+    start, help_command, handle_main_menu, cancel, end_conversation,
+    handle_callback
+)
 from handlers.settings import (
-    settings_menu, set_delay_prompt, receive_delay_input,
+    set_delay_prompt, receive_delay_input,
     set_retry_prompt, receive_retry_input,
-    set_footer_prompt, receive_footer_input
+    set_footer_prompt, receive_footer_input, clear_footer,
+    set_max_batch_prompt, receive_max_batch_input
+)
+from constants.states import (
+    AWAIT_DELAY, AWAIT_RETRY, AWAIT_FOOTER, AWAIT_CHANNEL_ID,
+    AWAIT_SCHEDULED_MESSAGE, AWAIT_SCHEDULED_TIME, AWAIT_BATCH_MESSAGE,
+    AWAIT_MAX_BATCH
 )
 
 # Enable logging
@@ -29,88 +38,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+config = get_config()
+
+# Filters are built once here and shared by every handler registration below
+# Message filters also match edited messages, which have no update.message; the handlers expect one
+NEW_MESSAGE = filters.UpdateType.MESSAGE
+ADMIN_USER_FILTER = filters.User(list(config.get_admin_ids()))
+MAIN_MENU_LABELS = ("Admin", "Channels", "Batch", "Schedule", "Post", "Settings", "Back to Main Menu")
+# Menu taps send the exact label, so a set lookup is enough; no regex needed
+MAIN_MENU_FILTER = NEW_MESSAGE & filters.Text(frozenset(MAIN_MENU_LABELS))
+BATCH_FILTER = NEW_MESSAGE & filters.Text(("Batch",))
+ADMIN_TEXT = NEW_MESSAGE & AdminTextFilter(config.get_admin_ids(), excluded=MAIN_MENU_LABELS)
+
+def use_uvloop():
+    # libuv-based event loop with less per-callback overhead; optional, and not available on Windows
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+async def reload_on_sighup(application):
+    # Re-read config/fixed_channels.json after editing it by hand: kill -HUP <pid>
+    # Handled on the event loop, so it never interrupts a thread holding the config lock
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, config.reload)
+
 def main():
-    config = ConfigManager()
     bot_token = config.get_bot_token()
 
     if not bot_token:
         logger.error("BOT_TOKEN not found in .env file. Please set it.")
         return
 
-    application = ApplicationBuilder().token(bot_token).build()
-
-    # Command Handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-
-    # Message Handlers
-    application.add_handler(MessageHandler(filters.Regex("^Admin$"), admin_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Channels$"), channel_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Batch$"), batch_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Schedule$"), schedule_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Post$"), post_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Settings$"), settings_menu))
-    application.add_handler(MessageHandler(filters.Regex("^Back to Main Menu$"), back_to_main_menu))
-
-    # Channel Management Handlers
-    application.add_handler(CallbackQueryHandler(add_channel_prompt, pattern="^add_channel$"))
-    application.add_handler(MessageHandler(
-        filters.ChatType.CHANNEL | filters.TEXT & filters.User(config.get_admin_ids()),
-        handle_channel_input
-    ))
-    application.add_handler(CallbackQueryHandler(manage_channel, pattern="^channel_\\d+$"))
-    application.add_handler(CallbackQueryHandler(remove_channel, pattern="^remove_channel_\\d+$"))
-    application.add_handler(CallbackQueryHandler(back_to_channels, pattern="^back_to_channels$"))
-
-    # Batch Management Handlers
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_batch_message")),
-        collect_message
-    ))
-    application.add_handler(CommandHandler("clear_batch", clear_batch))
-    application.add_handler(CommandHandler("show_batch", show_batch))
-
-    # Schedule Management Handlers
-    application.add_handler(CallbackQueryHandler(view_scheduled_posts, pattern="^view_scheduled$"))
-    application.add_handler(CallbackQueryHandler(schedule_new_post_prompt, pattern="^schedule_new$"))
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_scheduled_message")),
-        receive_scheduled_message
-    ))
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_scheduled_time")),
-        receive_scheduled_time
-    ))
+    use_uvloop()
+    # Posting fans out to several channels at once; over HTTP/2 those requests share one connection
+    # instead of each opening its own TCP+TLS connection from the pool
+    application = ApplicationBuilder().token(bot_token).http_version("2").post_init(reload_on_sighup).build()
 
-    # Post Management Handlers
-    application.add_handler(CommandHandler("preview_post", preview_post))
-    application.add_handler(CallbackQueryHandler(execute_post, pattern="^(confirm_post|cancel_post)$"))
+    input_flows = ConversationHandler(
+        entry_points=[
+            CallbackQueryHandler(set_delay_prompt, pattern="^set_delay$"),
+            CallbackQueryHandler(set_retry_prompt, pattern="^set_retry$"),
+            CallbackQueryHandler(set_footer_prompt, pattern="^set_footer$"),
+            CallbackQueryHandler(set_max_batch_prompt, pattern="^set_max_batch$"),
+            CallbackQueryHandler(add_channel_prompt, pattern="^add_channel$"),
+            CallbackQueryHandler(schedule_new_post_prompt, pattern="^schedule_new$"),
+            MessageHandler(BATCH_FILTER, batch_menu),
+        ],
+        states={
+            AWAIT_DELAY: [MessageHandler(ADMIN_TEXT, receive_delay_input)],
+            AWAIT_RETRY: [MessageHandler(ADMIN_TEXT, receive_retry_input)],
+            AWAIT_FOOTER: [
+                CommandHandler("clear_footer", clear_footer, filters=NEW_MESSAGE & ADMIN_USER_FILTER),
+                MessageHandler(ADMIN_TEXT, receive_footer_input),
+            ],
+            AWAIT_MAX_BATCH: [MessageHandler(ADMIN_TEXT, receive_max_batch_input)],
+            AWAIT_CHANNEL_ID: [MessageHandler(
+                ADMIN_TEXT | NEW_MESSAGE & filters.FORWARDED & ADMIN_USER_FILTER,
+                handle_channel_input
+            )],
+            AWAIT_SCHEDULED_MESSAGE: [MessageHandler(ADMIN_TEXT, receive_scheduled_message)],
+            AWAIT_SCHEDULED_TIME: [MessageHandler(ADMIN_TEXT, receive_scheduled_time)],
+            AWAIT_BATCH_MESSAGE: [MessageHandler(ADMIN_TEXT, collect_message)],
+        },
+        fallbacks=[
+            CommandHandler("cancel", cancel, filters=NEW_MESSAGE),
+            MessageHandler(MAIN_MENU_FILTER, end_conversation),
+        ],
+        allow_reentry=True,
+    )
 
-    # Settings Handlers
-    application.add_handler(CallbackQueryHandler(set_delay_prompt, pattern="^set_delay$"))
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_delay_input")),
-        receive_delay_input
-    ))
-    application.add_handler(CallbackQueryHandler(set_retry_prompt, pattern="^set_retry$"))
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_retry_input")),
-        receive_retry_input
-    ))
-    application.add_handler(CallbackQueryHandler(set_footer_prompt, pattern="^set_footer$"))
-    application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(config.get_admin_ids()) &
-        filters.Context(lambda ctx: ctx.user_data.get("awaiting_footer_input")),
-        receive_footer_input
-    ))
+    # All handlers are registered in one call. The input flows are kept in their own group so that
+    # main menu buttons, which end any pending flow through the fallbacks, still reach group 0.
+    application.add_handlers({
+        -1: [input_flows],
+        0: [
+            # Commands
+            CommandHandler("start", start),
+            CommandHandler("help", help_command),
+            CommandHandler("clear_batch", clear_batch),
+            CommandHandler("show_batch", show_batch),
+            CommandHandler("preview_post", preview_post),
+            # Main menu buttons
+            MessageHandler(MAIN_MENU_FILTER, handle_main_menu),
+            # Inline buttons are routed by handle_callback with a dict lookup instead of one regex per handler
+            CallbackQueryHandler(handle_callback),
+        ],
+    })
 
     # Run the bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    webhook_url = config.get_webhook_url()
+    if webhook_url:
+        # Telegram pushes updates to us, no getUpdates long-polling round-trips while idle.
+        # The token in the path keeps the endpoint from being guessed.
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=config.get_port(),
+            url_path=bot_token,
+            webhook_url=f"{webhook_url.rstrip('/')}/{bot_token}",
+            allowed_updates=Update.ALL_TYPES,
+        )
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,14 @@
+import functools
+from config.manager import get_config
+from constants.emoji import Emoji
+
+ADMIN_IDS = get_config().get_admin_ids()
+
+def require_admin(handler):
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        if update.effective_user.id not in ADMIN_IDS:
+            await update.effective_message.reply_text(f"{Emoji.WARNING} You are not authorized to access this function.")
+            return
+        return await handler(update, context)
+    return wrapper
@@ -0,0 +1,17 @@
+from telegram.ext import filters
+
+class AdminTextFilter(filters.MessageFilter):
+    # Equivalent to filters.TEXT & ~filters.COMMAND & filters.User(admin_ids) minus a set of
+    # exact texts, evaluated in a single call instead of a tree of merged filters
+    __slots__ = ("admin_ids", "excluded")
+
+    def __init__(self, admin_ids, excluded=()):
+        super().__init__(name="AdminTextFilter")
+        self.admin_ids = frozenset(admin_ids)
+        self.excluded = frozenset(excluded)
+
+    def filter(self, message):
+        text = message.text
+        if text is None or text in self.excluded or text.startswith("/"):
+            return False
+        return message.from_user is not None and message.from_user.id in self.admin_ids
@@ -1,10 +1,47 @@
-import datetime
+import time
+import functools
 
 def format_timestamp(timestamp):
-    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+    return _format_epoch_seconds(int(timestamp))
+
+# Scheduled posts are listed again on every view, so the same few timestamps come back often
+@functools.lru_cache(maxsize=4096)
+def _format_epoch_seconds(seconds):
+    # Formats the epoch seconds directly, without building a datetime object
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+
+def truncate(text, length):
+    # Only marks the text as cut when something was actually cut
+    return text if len(text) <= length else f"{text[:length]}..."
+
+# Every character MarkdownV2 reserves, backslash included, per the Bot API docs
+_MARKDOWN_V2_ESCAPE = str.maketrans({char: f"\\{char}" for char in "\\_*[]()~`>#+-=|{}.!"})
 
 def escape_markdown_v2(text):
-    escape_chars = "._*-[]()~`>#+-=|{}!"
-    return "".join([f"\\{char}" if char in escape_chars else char for char in text])
+    return text.translate(_MARKDOWN_V2_ESCAPE)
 
+# Telegram rejects text messages longer than 4096 characters
+MAX_MESSAGE_LENGTH = 4096
 
+def pack_messages(messages, limit=MAX_MESSAGE_LENGTH, separator="\n"):
+    # Greedily join messages into as few chunks of at most `limit` characters as possible
+    chunks = []
+    buf = []
+    size = 0
+    for message in messages:
+        while len(message) > limit:
+            if buf:
+                chunks.append(separator.join(buf))
+                buf, size = [], 0
+            chunks.append(message[:limit])
+            message = message[limit:]
+        added = len(message) + (len(separator) if buf else 0)
+        if buf and size + added > limit:
+            chunks.append(separator.join(buf))
+            buf, size = [], 0
+            added = len(message)
+        buf.append(message)
+        size += added
+    if buf:
+        chunks.append(separator.join(buf))
+    return chunks
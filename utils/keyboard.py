@@ -1,51 +1,66 @@
+import functools
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 
+# Static keyboards are built once at import; telegram objects are immutable, so sharing them is safe
+_MAIN_MENU = ReplyKeyboardMarkup([
+    [KeyboardButton("Channels"), KeyboardButton("Batch")],
+    [KeyboardButton("Schedule"), KeyboardButton("Post")],
+    [KeyboardButton("Settings"), KeyboardButton("Admin")]
+], resize_keyboard=True)
+
+_BACK_BUTTON = ReplyKeyboardMarkup([[KeyboardButton("Back to Main Menu")]], resize_keyboard=True)
+
+_CONFIRM_POST = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Confirm Post", callback_data="confirm_post")],
+    [InlineKeyboardButton("Cancel", callback_data="cancel_post")]
+])
+
+_SCHEDULE_OPTIONS = InlineKeyboardMarkup([
+    [InlineKeyboardButton("View Scheduled Posts", callback_data="view_scheduled")],
+    [InlineKeyboardButton("Schedule New Post", callback_data="schedule_new")]
+])
+
+_SETTINGS = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Set Delay", callback_data="set_delay")],
+    [InlineKeyboardButton("Set Retry Attempts", callback_data="set_retry")],
+    [InlineKeyboardButton("Set Footer", callback_data="set_footer")],
+    [InlineKeyboardButton("Set Max Batch Size", callback_data="set_max_batch")],
+    [InlineKeyboardButton("Toggle Message Merging", callback_data="toggle_merge")]
+])
+
+# Fixed rows of the per-channel keyboards, built once and reused by every call
+_BACK_TO_CHANNELS_ROW = (InlineKeyboardButton("Back to Channels", callback_data="back_to_channels"),)
+_ADD_CHANNEL_ROW = (InlineKeyboardButton("Add Channel", callback_data="add_channel"),)
+
 def main_menu_keyboard():
-    keyboard = [
-        [KeyboardButton("Channels"), KeyboardButton("Batch")],
-        [KeyboardButton("Schedule"), KeyboardButton("Post")],
-        [KeyboardButton("Settings"), KeyboardButton("Admin")]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return _MAIN_MENU
 
 def back_button_keyboard():
-    keyboard = [[KeyboardButton("Back to Main Menu")]]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return _BACK_BUTTON
 
 def confirm_post_keyboard():
-    keyboard = [
-        [InlineKeyboardButton("Confirm Post", callback_data="confirm_post")],
-        [InlineKeyboardButton("Cancel", callback_data="cancel_post")]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return _CONFIRM_POST
 
 def channel_list_keyboard(channels):
-    buttons = []
-    for channel in channels:
-        buttons.append([InlineKeyboardButton(channel["name"], callback_data=f"channel_{channel["id"]}")])
-    buttons.append([InlineKeyboardButton("Add Channel", callback_data="add_channel")])
+    return _channel_list_keyboard(tuple((channel["id"], channel["name"]) for channel in channels))
+
+# Keyed on (id, name) pairs, so the keyboard is only rebuilt after the channel list changes
+@functools.lru_cache(maxsize=8)
+def _channel_list_keyboard(channels):
+    buttons = [[InlineKeyboardButton(name, callback_data=f"channel_{channel_id}")] for channel_id, name in channels]
+    buttons.append(_ADD_CHANNEL_ROW)
     return InlineKeyboardMarkup(buttons)
 
+@functools.lru_cache(maxsize=128)
 def channel_manage_keyboard(channel_id):
     keyboard = [
         [InlineKeyboardButton("Remove Channel", callback_data=f"remove_channel_{channel_id}")],
-        [InlineKeyboardButton("Back to Channels", callback_data="back_to_channels")]
+        _BACK_TO_CHANNELS_ROW
     ]
     return InlineKeyboardMarkup(keyboard)
 
 def schedule_options_keyboard():
-    keyboard = [
-        [InlineKeyboardButton("View Scheduled Posts", callback_data="view_scheduled")],
-        [InlineKeyboardButton("Schedule New Post", callback_data="schedule_new")]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return _SCHEDULE_OPTIONS
 
 def settings_keyboard():
-    keyboard = [
-        [InlineKeyboardButton("Set Delay", callback_data="set_delay")],
-        [InlineKeyboardButton("Set Retry Attempts", callback_data="set_retry")],
-        [InlineKeyboardButton("Set Footer", callback_data="set_footer")]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
+    return _SETTINGS
@@ -0,0 +1,10 @@
+from telegram.error import BadRequest
+
+async def edit_if_changed(query, text, reply_markup=None):
+    # Pressing the same button twice re-renders identical content, which Telegram rejects
+    # with "Message is not modified"; that is not an error for the user
+    try:
+        await query.edit_message_text(text, reply_markup=reply_markup)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
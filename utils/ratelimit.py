@@ -0,0 +1,34 @@
+import asyncio
+import time
+from collections import deque
+
+# Telegram allows about 20 messages per minute to the same group or channel
+CHAT_RATE = 20
+CHAT_PERIOD = 60
+
+class ChatRateLimiter:
+    # Sliding window: at most `rate` acquisitions in any `period` seconds
+    __slots__ = ("rate", "period", "_sent", "_lock")
+
+    def __init__(self, rate=CHAT_RATE, period=CHAT_PERIOD):
+        self.rate = rate
+        self.period = period
+        self._sent = deque(maxlen=rate)
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            if len(self._sent) == self.rate:
+                delay = self._sent[0] + self.period - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._sent.append(time.monotonic())
+
+_chat_limiters = {}
+
+def chat_limiter(chat_id):
+    # One limiter per chat, so different channels never wait on each other
+    limiter = _chat_limiters.get(chat_id)
+    if limiter is None:
+        limiter = _chat_limiters[chat_id] = ChatRateLimiter()
+    return limiter
@@ -1,15 +1,37 @@
+import re
+
+# Bot API ids of channels and supergroups: -(10**12 + internal id), internal id < 997852516352
+MIN_CHANNEL_ID = -1_997_852_516_352
+MAX_CHANNEL_ID = -1_000_000_000_001
+
 def is_valid_channel_id(channel_id):
-    return isinstance(channel_id, (int, str)) and str(channel_id).startswith("-100")
+    if isinstance(channel_id, int):
+        return MIN_CHANNEL_ID <= channel_id <= MAX_CHANNEL_ID
+    return isinstance(channel_id, str) and channel_id.startswith("-100")
 
 def is_valid_user_id(user_id):
     return isinstance(user_id, int) and user_id > 0
 
+# Longest digit string parse_non_negative_int converts; only guards int() against huge input,
+# callers check the range that makes sense for each value
+MAX_INT_DIGITS = 9
+
+def parse_non_negative_int(text):
+    # Rejects typos without raising and catching ValueError; returns None if invalid
+    text = text.strip()
+    return int(text) if text.isdecimal() and len(text) <= MAX_INT_DIGITS else None
+
+# H:MM or HH:MM, with the hour and minute ranges checked by the pattern itself
+_TIME_RE = re.compile(r"([01]?\d|2[0-3]):([0-5]?\d)")
+
+def parse_time_format(time_str):
+    # Basic validation for HH:MM format; returns (hour, minute), or None if invalid
+    match = _TIME_RE.fullmatch(time_str.strip())
+    if match is None:
+        return None
+    return int(match[1]), int(match[2])
+
 def is_valid_time_format(time_str):
-    # Basic validation for HH:MM format
-    try:
-        h, m = map(int, time_str.split(":"))
-        return 0 <= h <= 23 and 0 <= m <= 59
-    except ValueError:
-        return False
+    return parse_time_format(time_str) is not None
 
 